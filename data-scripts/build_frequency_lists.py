@@ -1,10 +1,8 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
+import heapq
 import itertools
 import os
 import sys
-import textwrap
-import time
-import codecs
 
 from operator import itemgetter
 
@@ -39,39 +37,49 @@ DICTIONARIES = dict(
     female_names      = None,
 )
 
-# returns {list_name: {token: rank}}, as tokens and ranks occur in each file.
+# returns {token: rank}, ordered by rank, as tokens and ranks occur in the file.
+def parse_frequency_list(path):
+    # decode the whole file at once rather than line by line. split on '\n'
+    # only: str.splitlines() also breaks on eg '\x85' and '\u2028'.
+    with open(path, 'rb') as f:
+        lines = f.read().decode('utf-8').split('\n')
+    if not lines[-1]:
+        lines.pop()
+    tokens = [line.split(None, 1)[0] for line in lines]
+    token_to_rank = dict(zip(tokens, range(1, len(tokens) + 1))) # rank starts at 1
+    if len(token_to_rank) != len(tokens):
+        # a repeated token takes its later rank but keeps its first
+        # position; restore rank order.
+        token_to_rank = dict(sorted(token_to_rank.items(), key=itemgetter(1)))
+    return token_to_rank
+
+# returns {list_name: {token: rank}}, as tokens and ranks occur in each file,
+# with each {token: rank} dict ordered by rank.
 def parse_frequency_lists(data_dir):
     freq_lists = {}
-    for filename in os.listdir(data_dir):
-        freq_list_name, ext = os.path.splitext(filename)
-        if freq_list_name not in DICTIONARIES:
-            msg = 'Warning: %s appears in %s directory but not in DICTIONARY settings. Excluding.'
-            print(msg % (freq_list_name, data_dir))
-            continue
-        token_to_rank = {}
-        with codecs.open(os.path.join(data_dir, filename), 'r', 'utf8') as f:
-            for i, line in enumerate(f):
-                rank = i + 1 # rank starts at 1
-                token = line.split()[0]
-                token_to_rank[token] = rank
-        freq_lists[freq_list_name] = token_to_rank
+    filenames = dict((os.path.splitext(filename)[0], filename)
+                     for filename in os.listdir(data_dir))
+    for freq_list_name in sorted(set(filenames) - set(DICTIONARIES)):
+        msg = 'Warning: %s appears in %s directory but not in DICTIONARY settings. Excluding.'
+        print(msg % (freq_list_name, data_dir))
+    for freq_list_name in sorted(set(filenames) & set(DICTIONARIES)):
+        # serial on purpose: pool startup + pickling outweighs the parse itself
+        path = os.path.join(data_dir, filenames[freq_list_name])
+        freq_lists[freq_list_name] = parse_frequency_list(path)
     for freq_list_name in DICTIONARIES:
         if freq_list_name not in freq_lists:
             msg = 'Warning: %s appears in DICTIONARY settings but not in %s directory. Excluding.'
-            print(msg % (freq_list, data_dir))
+            print(msg % (freq_list_name, data_dir))
     return freq_lists
 
-def is_rare_and_short(token, rank):
-    return rank >= 10**len(token)
+# POW10[n] == 10**n, to avoid a bignum pow per token in is-rare-and-short checks
+POW10 = tuple(10**i for i in range(64))
 
-def has_comma_or_double_quote(token, rank, lst_name):
-    # hax, switch to csv or similar if this excludes too much.
-    # simple comma joining has the advantage of being easy to process
-    # client-side w/o needing a lib, and so far this only excludes a few
-    # very high-rank tokens eg 'ps8,000' at rank 74868 from wikipedia list.
-    if ',' in token or '"' in token:
-        return True
-    return False
+# hax, switch to csv or similar if this excludes too much.
+# simple comma joining has the advantage of being easy to process
+# client-side w/o needing a lib, and so far this only excludes a few
+# very high-rank tokens eg 'ps8,000' at rank 74868 from wikipedia list.
+COMMA_OR_DOUBLE_QUOTE = frozenset(',"')
 
 def filter_frequency_lists(freq_lists):
     '''
@@ -81,76 +89,73 @@ def filter_frequency_lists(freq_lists):
           at lower rank.
         - cut off final freq_list at limits set in DICTIONARIES, if any.
     '''
-    filtered_token_and_rank = {} # maps {name: [(token, rank), ...]}
-    token_count = {}             # maps freq list name: current token count.
-    for name in freq_lists:
-        filtered_token_and_rank[name] = []
-        token_count[name] = 0
-    minimum_rank = {} # maps token -> lowest token rank across all freq lists
-    minimum_name = {} # maps token -> freq list name with lowest token rank
-    for name, token_to_rank in sorted(freq_lists.items()):
-        for token, rank in token_to_rank.items():
-            if token not in minimum_rank:
-                assert token not in minimum_name
-                minimum_rank[token] = rank
-                minimum_name[token] = name
-            else:
-                assert token in minimum_name
-                assert minimum_name[token] != name, 'same token occurs multiple times in %s' % name
-                min_rank = minimum_rank[token]
-                if rank < min_rank:
-                    minimum_rank[token] = rank
-                    minimum_name[token] = name
-    for name, token_to_rank in sorted(freq_lists.items()):
-        for token, rank in token_to_rank.items():
-            if minimum_name[token] != name:
-                continue
-            if is_rare_and_short(token, rank) or has_comma_or_double_quote(token, rank, name):
-                continue
-            filtered_token_and_rank[name].append((token, rank))
-            token_count[name] += 1
-    result = {}
-    for name, token_rank_pairs in filtered_token_and_rank.items():
-        token_rank_pairs.sort(key=itemgetter(1))
+    names = sorted(freq_lists)
+    result = dict((name, []) for name in names)
+    # walk every list at once in global rank order (ties going to the
+    # alphabetically first list), so the first time a token is seen is
+    # in the list where it has lowest rank.
+    streams = [zip(freq_lists[name].values(), itertools.repeat(i), freq_lists[name].keys())
+               for i, name in enumerate(names)]
+    seen = set()
+    for rank, i, token in heapq.merge(*streams):
+        if token in seen:
+            continue
+        seen.add(token)
+        name = names[i]
+        tokens = result[name]
         cutoff_limit = DICTIONARIES[name]
-        if cutoff_limit and len(token_rank_pairs) > cutoff_limit:
-            token_rank_pairs = token_rank_pairs[:cutoff_limit]
-        result[name] = [pair[0] for pair in token_rank_pairs] # discard rank post-sort
+        if cutoff_limit and len(tokens) == cutoff_limit:
+            continue
+        # rare and short: rank >= 10**len(token)
+        if len(token) < len(POW10) and rank >= POW10[len(token)]:
+            continue
+        if not COMMA_OR_DOUBLE_QUOTE.isdisjoint(token):
+            continue
+        tokens.append(token)
     return result
 
 def to_kv(lst, lst_name):
     val = '"%s".split(",")' % ','.join(lst)
     return '%s: %s' % (lst_name, val)
 
-def output_coffee(args, script_name, freq_lists):
-    (output_file,) = args
-    with codecs.open(output_file, 'w', 'utf8') as f:
-        f.write('# generated by %s\n' % script_name)
-        f.write('frequency_lists = \n  ')
-        lines = []
-        for name, lst in freq_lists.items():
-            lines.append(to_kv(lst, name))
-        f.write('\n  '.join(lines))
-        f.write('\n')
-        f.write('module.exports = frequency_lists\n')
-
+def output_coffee(output_file, script_name, freq_lists):
+    lines = []
+    for name, lst in freq_lists.items():
+        lines.append(to_kv(lst, name))
+    text = ('# generated by %s\n' % script_name +
+            'frequency_lists = \n  ' +
+            '\n  '.join(lines) +
+            '\n' +
+            'module.exports = frequency_lists\n')
+    with open(output_file, 'wb') as f:
+        f.write(text.encode('utf-8'))
+
+# escapes utf-8 bytes for use in a C string literal. chained bytes.replace
+# beats a translate/re.sub based single pass here: tokens are short and
+# almost never contain either character, which replace checks without copying.
 def escape(x):
-    return x.replace("\\", "\\\\").replace("\"", "\\\"")
+    return x.replace(b"\\", b"\\\\").replace(b"\"", b"\\\"")
+
+# LEN_PREFIX[n] is the octal C string escape for a length byte of n.
+# SHORT_LEN_PREFIX[n] is the same escape without leading zeros, which is
+# only safe when the next byte is not an octal digit.
+LEN_PREFIX = tuple(b"\\%03o" % (i,) for i in range(256))
+SHORT_LEN_PREFIX = tuple(b"\\%o" % (i,) for i in range(256))
+OCTAL_DIGITS = frozenset(b"01234567")
 
 def output_hpp(output_file_hpp, script_name, freq_lists):
     # make ordered a-list
     freq_lists_alist = list(sorted(freq_lists.items()))
 
-    with codecs.open(output_file_hpp, 'w', 'utf8') as f:
-        f.write('// generated by %s\n' % (script_name,))
-        tags = ',\n  '.join(k.upper() for (k, _) in freq_lists_alist + [("USER_INPUTS", None)])
-        f.write("""#ifndef __ZXCVBN___FREQUENCY_LISTS_HPP
+    tags = ',\n  '.join(k.upper() for (k, _) in freq_lists_alist + [("USER_INPUTS", None)])
+    text = '// generated by %s\n' % (script_name,)
+    text += """#ifndef __ZXCVBN___FREQUENCY_LISTS_HPP
 #define __ZXCVBN___FREQUENCY_LISTS_HPP
 
 #include <zxcvbn/frequency_lists_common.hpp>
 
+#include <array>
 #include <initializer_list>
-#include <unordered_map>
 
 namespace zxcvbn {
 
@@ -160,49 +165,67 @@ enum class DictionaryTag {
   %s
 };
 
-std::unordered_map<DictionaryTag, RankedDict> & get_default_ranked_dicts();
+// indexed by DictionaryTag, USER_INPUTS excluded
+using DefaultRankedDicts = std::array<RankedDict, %d>;
+
+DefaultRankedDicts & get_default_ranked_dicts();
 
 }
 
 }
 
-#endif"""  % (tags,))
+#endif"""  % (tags, len(freq_lists_alist))
+    with open(output_file_hpp, 'wb') as f:
+        f.write(text.encode('utf-8'))
 
 def output_cpp(output_file_cpp, script_name, freq_lists):
     # make ordered a-list
     freq_lists_alist = list(sorted(freq_lists.items()))
 
-    with codecs.open(output_file_cpp, 'w', 'utf8') as f:
-        f.write('// generated by %s\n' % (script_name,))
-        f.write("#include <zxcvbn/_frequency_lists.hpp>\n")
-        f.write("#include <zxcvbn/frequency_lists.hpp>\n")
-        f.write("#include <initializer_list>\n")
-        f.write("#include <cstring>\n")
-        f.write("\n")
+    out = bytearray()
+    out += b'// generated by %s\n' % (script_name.encode('utf-8'),)
+    out += b"#include <zxcvbn/_frequency_lists.hpp>\n"
+    out += b"#include <zxcvbn/frequency_lists.hpp>\n"
+    out += b"#include <initializer_list>\n"
+    out += b"#include <cstddef>\n"
+    out += b"\n"
 
-        f.write("""namespace zxcvbn {
+    out += b"""namespace zxcvbn {
 
 namespace _frequency_lists {
 
-""")
-        tw = textwrap.TextWrapper()
-        tw.initial_indent = '    '
-        tw.subsequent_indent = '    '
-        tw.drop_whitespace = True
-        tw.break_long_words = False
-        tw.break_on_hyphens = False
-        f.write("const char *const FREQ_LISTS[] = {\n")
-
-        for name, lst in freq_lists_alist:
-            f.write('"')
-            for word in lst:
-                assert len(word) <= 255
-                f.write("\\%03o" % (len(word),))
-                f.write(escape(word))
-            f.write('",\n')
-        f.write("};\n\n")
-
-        f.write("""
+"""
+    # all lists are packed back to back into one FREQ_LISTS_DATA array
+    # (adjacent string literals concatenate), and list i spans
+    # [FREQ_LIST_OFFSETS[i], FREQ_LIST_OFFSETS[i + 1]).
+    out += b"static const char FREQ_LISTS_DATA[] =\n"
+    offsets = [0]
+    for name, lst in freq_lists_alist:
+        # each word is packed as an octal-escaped byte length followed
+        # by its escaped utf-8 bytes
+        out += b'"'
+        offset = offsets[-1]
+        for word in lst:
+            w = word.encode('utf-8')
+            assert len(w) <= 255
+            if w[0] in OCTAL_DIGITS:
+                out += LEN_PREFIX[len(w)]
+            else:
+                out += SHORT_LEN_PREFIX[len(w)]
+            out += escape(w)
+            offset += 1 + len(w)
+        out += b'"\n'
+        offsets.append(offset)
+    out += b";\n\n"
+
+    out += b"static constexpr std::size_t FREQ_LIST_OFFSETS[] = {\n"
+    for offset in offsets:
+        out += b"%d,\n" % (offset,)
+    out += b"};\n\n"
+    out += b"static_assert(sizeof(FREQ_LISTS_DATA) == FREQ_LIST_OFFSETS[%d] + 1,\n" % (len(freq_lists_alist),)
+    out += b'              "FREQ_LIST_OFFSETS out of sync with FREQ_LISTS_DATA");\n\n'
+
+    out += b"""
 class WordIterator {
   const char *_words;
     std::string _cur;
@@ -256,35 +279,39 @@ public:
 };
 
 static
-std::unordered_map<DictionaryTag, RankedDict> build_static_ranked_dicts() {
-  std::unordered_map<DictionaryTag, RankedDict> toret;
-  std::underlying_type_t<DictionaryTag> tag_idx = 0;
-  for (const auto & strs : FREQ_LISTS) {
-    toret.insert(std::make_pair(static_cast<DictionaryTag>(tag_idx),
-                                build_ranked_dict(WordIterable(strs, std::strlen(strs)))));
-    tag_idx += 1;
+DefaultRankedDicts build_static_ranked_dicts() {
+  DefaultRankedDicts toret;
+  static_assert(std::tuple_size<DefaultRankedDicts>::value ==
+                sizeof(FREQ_LIST_OFFSETS) / sizeof(FREQ_LIST_OFFSETS[0]) - 1,
+                "DefaultRankedDicts out of sync with FREQ_LIST_OFFSETS");
+  for (std::size_t i = 0; i < toret.size(); ++i) {
+    toret[i] = build_ranked_dict(WordIterable(FREQ_LISTS_DATA + FREQ_LIST_OFFSETS[i],
+                                              FREQ_LIST_OFFSETS[i + 1] - FREQ_LIST_OFFSETS[i]));
   }
   return toret;
 }
 
 static auto _ranked_dicts = build_static_ranked_dicts();
 
-std::unordered_map<DictionaryTag, RankedDict> & get_default_ranked_dicts() {
+DefaultRankedDicts & get_default_ranked_dicts() {
   return _ranked_dicts;
 }
 
-""")
-        f.write("}\n\n}\n")
+"""
+    out += b"}\n\n}\n"
+    with open(output_file_cpp, 'wb') as f:
+        f.write(out)
 
 def output_inc_js(output_file_js, script_name, freq_lists):
-    with codecs.open(output_file_js, 'w', 'utf8') as f:
-        f.write('/* generated by %s */\n' % (script_name,))
-        f.write('{\n')
-        lines = []
-        for name, lst in freq_lists.items():
-            lines.append(to_kv(lst, '"' + name + '"'))
-        f.write(',\n  '.join(lines))
-        f.write('}')
+    lines = []
+    for name, lst in freq_lists.items():
+        lines.append(to_kv(lst, '"' + name + '"'))
+    text = ('/* generated by %s */\n' % (script_name,) +
+            '{\n' +
+            ',\n  '.join(lines) +
+            '}')
+    with open(output_file_js, 'wb') as f:
+        f.write(text.encode('utf-8'))
 
 def main():
     if len(sys.argv) != 3:
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 import sys
 import codecs
 
@@ -29,7 +29,7 @@ def main(input_filename, output_filename):
 
 if __name__ == '__main__':
     if len(sys.argv) != 3:
-        print usage()
+        print(usage())
     else:
         main(*sys.argv[1:])
     sys.exit(0)
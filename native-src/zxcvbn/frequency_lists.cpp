@@ -2,6 +2,7 @@
 
 #include <zxcvbn/_frequency_lists.hpp>
 
+#include <functional>
 #include <unordered_map>
 
 namespace zxcvbn {
@@ -17,7 +18,14 @@ RankedDicts convert_to_ranked_dicts(std::unordered_map<DictionaryTag, RankedDict
 }
 
 RankedDicts default_ranked_dicts() {
-  return convert_to_ranked_dicts(_frequency_lists::get_default_ranked_dicts());
+  RankedDicts build;
+
+  const auto & ranked_dicts = _frequency_lists::get_default_ranked_dicts();
+  for (std::size_t i = 0; i < ranked_dicts.size(); ++i) {
+    build.insert(std::make_pair(static_cast<DictionaryTag>(i), std::cref(ranked_dicts[i])));
+  }
+
+  return build;
 }
 
 
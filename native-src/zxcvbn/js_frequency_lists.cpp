@@ -14,8 +14,8 @@ std::vector<std::string> js_keys(const emscripten::val & val) {
 }
 
 static
-std::unordered_map<DictionaryTag, RankedDict> build_static_ranked_dicts() {
-  auto result = std::unordered_map<DictionaryTag, RankedDict>();
+DefaultRankedDicts build_static_ranked_dicts() {
+  auto result = DefaultRankedDicts();
 
   auto js_frequency_list = emscripten::val::module_property("_frequency_lists");
 
@@ -29,8 +29,8 @@ std::unordered_map<DictionaryTag, RankedDict> build_static_ranked_dicts() {
       toadd.insert(std::make_pair(zxcvbn_js::from_val<std::string>(array[i]), i + 1));
     }
 
-    result.insert(std::make_pair(zxcvbn_js::_default_name_to_dict_tag.at(key),
-                                 std::move(toadd)));
+    auto tag = zxcvbn_js::_default_name_to_dict_tag.at(key);
+    result.at(static_cast<std::size_t>(tag)) = std::move(toadd);
   }
 
   return result;
@@ -38,7 +38,7 @@ std::unordered_map<DictionaryTag, RankedDict> build_static_ranked_dicts() {
 
 // Init _ranked_dicts in emscripten preMain() because it must
 // happen after emscripten::val is initialized
-static std::unordered_map<DictionaryTag, RankedDict> _ranked_dicts;
+static DefaultRankedDicts _ranked_dicts;
 
 extern "C"
 int init_ranked_dicts() {
@@ -56,7 +56,7 @@ int schedule_build() {
 
 extern const auto _schedule_built = schedule_build();
 
-std::unordered_map<DictionaryTag, RankedDict> & get_default_ranked_dicts() {
+DefaultRankedDicts & get_default_ranked_dicts() {
   return _ranked_dicts;
 }
 